@@ -17,12 +17,15 @@ Prometheus instrumentation:
 import os
 import sys
 import time
+import hashlib
 import logging
 from contextlib import asynccontextmanager
 
+import orjson
+
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from prometheus_client import (
     Counter,
     Histogram,
@@ -35,12 +38,15 @@ from prometheus_client import (
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from inference.schemas import (
+    DISCLAIMER,
     PredictionRequest,
     PredictionResponse,
     HealthResponse,
     DropdownValues,
+    STATIC_DROPDOWNS,
 )
 from inference.model_loader import ModelLoader
+from inference.batching import MicroBatcher
 
 # --- Logging ---
 logging.basicConfig(
@@ -51,10 +57,13 @@ logging.basicConfig(
 logger = logging.getLogger("inference")
 
 # --- Prometheus Metrics ---
+# Labels stay low-cardinality: endpoint is always the matched route
+# template (or "unmatched_route"), never the raw URL path, and the method
+# label is dropped since CORS restricts us to GET/POST/OPTIONS anyway.
 REQUEST_COUNT = Counter(
     "api_request_total",
     "Total API requests",
-    ["method", "endpoint", "status"],
+    ["endpoint", "status"],
 )
 PREDICTION_COUNT = Counter(
     "api_prediction_total",
@@ -64,7 +73,8 @@ REQUEST_LATENCY = Histogram(
     "api_request_duration_seconds",
     "Request duration in seconds",
     ["endpoint"],
-    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0],
+    # SLO-focused buckets for sub-second ML inference; fewer series per scrape
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0],
 )
 PREDICTION_ERRORS = Counter(
     "api_prediction_errors_total",
@@ -77,19 +87,40 @@ MODEL_INFO = Gauge(
 )
 
 # --- Model ---
+MODEL_PATH = os.environ.get("MODEL_PATH", "models/model.joblib")
+PREPROCESSOR_PATH = os.environ.get(
+    "PREPROCESSOR_PATH", "data/processed/preprocessor.joblib"
+)
+
 model_loader = ModelLoader()
+batcher = MicroBatcher(model_loader)
+
+# Under `gunicorn --preload` (set PRELOAD_MODEL=1), loading at import time
+# happens once in the master process, so fork() hands every worker a shared
+# copy-on-write mapping instead of N private loads. No threads are started
+# here, which keeps the pre-fork state safe. Lifespan remains the fallback.
+if os.environ.get("PRELOAD_MODEL") == "1":
+    try:
+        model_loader.load(MODEL_PATH, PREPROCESSOR_PATH)
+        model_loader.warmup()
+        logger.info(f"Model preloaded at import: {model_loader.version}")
+    except Exception as e:
+        logger.critical(f"PRELOAD_MODEL=1 but model load failed: {e}")
+
+# --- Dropdown cache ---
+# Dropdown values derive from params.yaml at import and never change at
+# runtime, so serialize once and serve the same bytes on every request.
+_DROPDOWN_BYTES = orjson.dumps(STATIC_DROPDOWNS.model_dump())
+_DROPDOWN_ETAG = f'"{hashlib.md5(_DROPDOWN_BYTES).hexdigest()}"'
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load model on startup."""
-    model_path = os.environ.get("MODEL_PATH", "models/model.joblib")
-    preprocessor_path = os.environ.get(
-        "PREPROCESSOR_PATH", "data/processed/preprocessor.joblib"
-    )
-
+    """Load model on startup (no-op when already preloaded at import)."""
     try:
-        model_loader.load(model_path, preprocessor_path)
+        if not model_loader.is_loaded:
+            model_loader.load(MODEL_PATH, PREPROCESSOR_PATH)
+            model_loader.warmup()
         MODEL_INFO.labels(version=model_loader.version).set(1)
         logger.info(f"Model loaded successfully: {model_loader.version}")
     except Exception as e:
@@ -97,9 +128,14 @@ async def lifespan(app: FastAPI):
         logger.critical("Failed to load model on startup. Marking as unavailable.")
         # DO NOT hard-crash. Let the service start but return 503 on health/predict
         # This prevents orchestrator crash loop backoffs that block API inspection.
-    
+
+    # Start the micro-batching scheduler that coalesces concurrent predictions
+    batcher.start()
+
     yield
 
+    await batcher.stop()
+
 
 # --- App ---
 # --- Security Headers & Middleware ---
@@ -114,6 +150,8 @@ app = FastAPI(
     ),
     version="1.0.0",
     lifespan=lifespan,
+    # orjson serializes small numeric payloads much faster than stdlib json
+    default_response_class=ORJSONResponse,
 )
 
 # Enforce allowed hosts (SEC-03: Dynamic host configuration)
@@ -145,10 +183,17 @@ app.add_middleware(
 )
 
 
-# --- Security Headers ---
+# --- Security Headers + Request Logging ---
+# A single middleware handles timing, metrics, logging and security headers;
+# registering them separately added one extra ASGI call_next hop per request.
 @app.middleware("http")
-async def add_security_headers(request: Request, call_next):
+async def request_pipeline(request: Request, call_next):
+    # perf_counter_ns is monotonic (no clock-skew negatives) and cheaper
+    # than time.time() on Linux
+    start_ns = time.perf_counter_ns()
     response = await call_next(request)
+    duration = (time.perf_counter_ns() - start_ns) / 1e9
+
     response.headers["X-Content-Type-Options"] = "nosniff"
     response.headers["X-Frame-Options"] = "DENY"
     response.headers["X-XSS-Protection"] = "1; mode=block"
@@ -164,32 +209,25 @@ async def add_security_headers(request: Request, call_next):
         )
     else:
         response.headers["Content-Security-Policy"] = "default-src 'self'"
-    
-    return response
-
-
-# --- Middleware for request logging ---
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    duration = time.time() - start_time
 
     # SECURITY FIX: Prevent high-cardinality label injection DoS
     route = request.scope.get("route")
     endpoint_label = route.path if route else "unmatched_route"
 
     REQUEST_COUNT.labels(
-        method=request.method,
         endpoint=endpoint_label,
         status=response.status_code,
     ).inc()
 
     REQUEST_LATENCY.labels(endpoint=endpoint_label).observe(duration)
 
+    # Lazy %-formatting: the message is only built when INFO is enabled
     logger.info(
-        f"{request.method} {request.url.path} "
-        f"status={response.status_code} duration={duration:.4f}s"
+        "%s %s status=%d duration=%.4fs",
+        request.method,
+        request.url.path,
+        response.status_code,
+        duration,
     )
 
     return response
@@ -239,18 +277,26 @@ async def predict(request: PredictionRequest):
             "Side_Effects": request.Side_Effects,
         }
 
-        prediction = model_loader.predict(input_data)
+        prediction = await batcher.submit(input_data)
         PREDICTION_COUNT.inc()
 
-        return PredictionResponse(
-            Patient_ID=request.Patient_ID,
-            Improvement_Score=prediction,
-            model_version=model_loader.version,
+        # Return a raw ORJSONResponse to skip the response-model round-trip;
+        # the payload shape is documented by response_model above.
+        return ORJSONResponse(
+            {
+                "Patient_ID": request.Patient_ID,
+                "Improvement_Score": prediction,
+                "model_version": model_loader.version,
+                "disclaimer": DISCLAIMER,
+            }
         )
 
     except Exception as e:
         PREDICTION_ERRORS.inc()
-        logger.error(f"Prediction error: {e}", exc_info=True)
+        # Traceback formatting is expensive; only include it under DEBUG
+        logger.error(
+            "Prediction error: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG)
+        )
         raise HTTPException(status_code=500, detail="Prediction failed due to an internal error.")
 
 
@@ -264,9 +310,19 @@ async def metrics():
 
 
 @app.get("/dropdown-values", response_model=DropdownValues, tags=["Frontend"])
-async def dropdown_values():
-    """Return valid dropdown values for the frontend form."""
-    return DropdownValues()
+async def dropdown_values(request: Request):
+    """Return valid dropdown values for the frontend form (cached bytes)."""
+    if request.headers.get("if-none-match") == _DROPDOWN_ETAG:
+        return Response(status_code=304, headers={"ETag": _DROPDOWN_ETAG})
+
+    return Response(
+        content=_DROPDOWN_BYTES,
+        media_type="application/json",
+        headers={
+            "ETag": _DROPDOWN_ETAG,
+            "Cache-Control": "public, max-age=3600",
+        },
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+"""
+Micro-batching Scheduler
+-------------------------
+Coalesces concurrent /predict requests into a single batched
+preprocessor.transform + model.predict call, amortizing sklearn
+per-call overhead across all requests in the batch.
+
+Requests are queued as (input_data, Future) pairs; a background task
+drains up to MAX_BATCH items (or whatever arrives within MAX_WAIT_MS)
+and fulfils each request's Future with its row's score.
+"""
+
+import os
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Batch window tuning (overridable via env for load testing)
+MAX_BATCH = int(os.environ.get("PREDICT_MAX_BATCH", 32))
+MAX_WAIT_MS = float(os.environ.get("PREDICT_MAX_WAIT_MS", 5.0))
+
+
+class MicroBatcher:
+    """Batches concurrent prediction requests behind an asyncio.Queue."""
+
+    def __init__(self, model_loader, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self._model_loader = model_loader
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000.0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        """Start the background drain task. Call from a running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(
+                f"Micro-batcher started (max_batch={self._max_batch}, "
+                f"max_wait={self._max_wait * 1000:.1f}ms)"
+            )
+
+    async def stop(self):
+        """Cancel the drain task and fail any requests still waiting."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # Nothing will drain the queue anymore; error out queued waiters
+        # instead of leaving their awaits hanging forever
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(
+                    RuntimeError("Batcher stopped before prediction ran")
+                )
+
+    async def submit(self, input_data: dict) -> float:
+        """Queue one input and wait for its predicted score."""
+        # Lazy-start so callers outside the app lifespan (e.g. tests) work too
+        if self._task is None:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((input_data, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+
+            try:
+                # Coalesce whatever else arrives before the deadline. The
+                # deadline is fixed when the first item lands, so the
+                # queueing delay added to any request is bounded by max_wait
+                # even under a steady trickle of arrivals.
+                deadline = loop.time() + self._max_wait
+                while len(batch) < self._max_batch:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(
+                                self._queue.get(), timeout=remaining
+                            )
+                        )
+                    except asyncio.TimeoutError:
+                        break
+
+                try:
+                    # Run the sklearn transform+predict in a worker thread so
+                    # the event loop keeps accepting connections while the
+                    # model runs
+                    if len(batch) == 1:
+                        # Single waiter: skip batch assembly entirely
+                        scores = [
+                            await asyncio.to_thread(
+                                self._model_loader.predict, batch[0][0]
+                            )
+                        ]
+                    else:
+                        scores = await asyncio.to_thread(
+                            self._model_loader.predict_batch,
+                            [input_data for input_data, _ in batch],
+                        )
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+            except asyncio.CancelledError:
+                # stop() mid-batch: fail the collected waiters before exiting
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(
+                            RuntimeError("Batcher stopped before prediction ran")
+                        )
+                raise
+
+            for (_, future), score in zip(batch, scores):
+                if not future.done():
+                    future.set_result(score)
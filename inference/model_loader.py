@@ -6,9 +6,11 @@ Singleton pattern with version tracking.
 """
 
 import os
+import time
 import hashlib
 import joblib
 import logging
+import numpy as np
 import pandas as pd
 from typing import Any
 
@@ -23,6 +25,7 @@ class ModelLoader:
     _preprocessor: Any = None
     _model_version: str = "unknown"
     _is_loaded: bool = False
+    _fast_path: bool = False
 
     def __new__(cls):
         if cls._instance is None:
@@ -46,19 +49,125 @@ class ModelLoader:
                 f"Preprocessor file not found: {preprocessor_path}"
             )
 
-        self._model = joblib.load(model_path)
-        self._preprocessor = joblib.load(preprocessor_path)
-
-        # Generate version hash from model file
+        # Memory-map the numpy arrays inside the artifacts: workers then share
+        # read-only pages from the page cache instead of each materializing a
+        # private heap copy. The files must stay on disk for the process
+        # lifetime; joblib silently falls back to a full load for compressed
+        # artifacts.
+        start = time.perf_counter()
+        self._model = joblib.load(model_path, mmap_mode="r")
+        self._preprocessor = joblib.load(preprocessor_path, mmap_mode="r")
+        load_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Artifacts deserialized in {load_ms:.0f} ms")
+
+        # Generate version hash from model file. Stream in 1 MiB chunks so
+        # startup RSS stays flat regardless of model size; the 8-char tag
+        # doesn't need SHA-256 strength, and BLAKE2 hashes faster.
+        hasher = hashlib.blake2b(digest_size=4)
         with open(model_path, "rb") as f:
-            model_hash = str(hashlib.sha256(f.read()).hexdigest())[:8]
-        self._model_version = f"v-{model_hash}"
+            while chunk := f.read(1 << 20):
+                hasher.update(chunk)
+        self._model_version = f"v-{hasher.hexdigest()}"
         self._is_loaded = True
+        self._build_fast_path()
 
         logger.info(f"Model loaded: version={self._model_version}")
         logger.info(f"  Model path: {model_path}")
         logger.info(f"  Preprocessor path: {preprocessor_path}")
 
+    def _build_fast_path(self):
+        """
+        Precompute per-feature transform tables from the fitted preprocessor
+        so predict can build the dense feature row directly in NumPy instead
+        of routing a 1-row DataFrame through ColumnTransformer dispatch.
+        Falls back to the DataFrame path if introspection fails.
+        """
+        try:
+            transformers = {
+                name: (trans, cols)
+                for name, trans, cols in self._preprocessor.transformers_
+            }
+            num_pipe, num_cols = transformers["num"]
+            cat_pipe, cat_cols = transformers["cat"]
+            scaler = num_pipe.named_steps["scaler"]
+            onehot = cat_pipe.named_steps["onehot"]
+
+            self._num_cols = list(num_cols)
+            self._num_mean = np.asarray(scaler.mean_, dtype=np.float64)
+            self._num_scale = np.asarray(scaler.scale_, dtype=np.float64)
+            self._cat_cols = list(cat_cols)
+
+            # Per categorical: value -> absolute one-hot column index
+            offset = len(self._num_cols)
+            self._cat_index = []
+            for categories in onehot.categories_:
+                self._cat_index.append(
+                    {value: offset + i for i, value in enumerate(categories)}
+                )
+                offset += len(categories)
+
+            self._n_features = offset
+            self._fast_path = True
+            logger.info(f"Fast predict path enabled ({self._n_features} features)")
+        except Exception as e:
+            self._fast_path = False
+            logger.warning(f"Fast predict path unavailable, using DataFrame path: {e}")
+
+    def _build_rows(self, inputs: list[dict]) -> np.ndarray:
+        """Build the dense (n, n_features) float32 matrix for a list of inputs."""
+        n = len(inputs)
+        x = np.zeros((n, self._n_features), dtype=np.float32)
+
+        if n == 1:
+            # Scalar fill beats array round-trips for a single row
+            item = inputs[0]
+            for j, col in enumerate(self._num_cols):
+                x[0, j] = (float(item[col]) - self._num_mean[j]) / self._num_scale[j]
+            for mapping, col in zip(self._cat_index, self._cat_cols):
+                idx = mapping.get(item[col])
+                # Unknown categories stay all-zero, matching handle_unknown="ignore"
+                if idx is not None:
+                    x[0, idx] = 1.0
+            return x
+
+        # Batch path: scale each numeric column in one vectorized pass and
+        # set all one-hot cells per categorical with a single fancy-index
+        # assignment, instead of touching cells row by row.
+        for j, col in enumerate(self._num_cols):
+            vals = np.fromiter(
+                (float(item[col]) for item in inputs), dtype=np.float64, count=n
+            )
+            x[:, j] = (vals - self._num_mean[j]) / self._num_scale[j]
+
+        row_idx = np.arange(n)
+        for mapping, col in zip(self._cat_index, self._cat_cols):
+            col_idx = np.fromiter(
+                (mapping.get(item[col], -1) for item in inputs),
+                dtype=np.int64,
+                count=n,
+            )
+            known = col_idx >= 0
+            x[row_idx[known], col_idx[known]] = 1.0
+        return x
+
+    def warmup(self):
+        """
+        Prime the predict path with synthetic rows at startup so the first
+        real request doesn't pay lazy NumPy/sklearn initialization costs.
+        """
+        if not (self._is_loaded and self._fast_path):
+            return
+
+        dummy = {
+            col: float(self._num_mean[j]) for j, col in enumerate(self._num_cols)
+        }
+        for mapping, col in zip(self._cat_index, self._cat_cols):
+            dummy[col] = next(iter(mapping))
+
+        self.predict(dummy)
+        self.predict_batch([dummy, dummy])
+        logger.info("Predict path warmed up")
+
     @property
     def model(self):
         if not self._is_loaded:
@@ -88,11 +197,12 @@ class ModelLoader:
         if not self._is_loaded:
             raise RuntimeError("Model not loaded. Call load() first.")
 
-        # Create DataFrame from input
-        df = pd.DataFrame([input_data])
-
-        # Apply preprocessor
-        X = self._preprocessor.transform(df)
+        if self._fast_path:
+            X = self._build_rows([input_data])
+        else:
+            # DataFrame fallback: route through the full preprocessor
+            df = pd.DataFrame([input_data])
+            X = self._preprocessor.transform(df)
 
         # Predict
         prediction = self._model.predict(X)[0]
@@ -101,3 +211,24 @@ class ModelLoader:
         prediction = max(0.0, min(10.0, float(prediction)))
 
         return float(f"{prediction:.2f}")
+
+    def predict_batch(self, inputs: list[dict]) -> list[float]:
+        """
+        Run prediction on a batch of inputs in a single transform+predict call.
+        Each input is a dict matching the CSV schema (minus Patient_ID and
+        Improvement_Score). Returns predicted Improvement_Scores in input order.
+        """
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded. Call load() first.")
+
+        # One feature matrix, one predict for the whole batch
+        if self._fast_path:
+            X = self._build_rows(inputs)
+        else:
+            df = pd.DataFrame(inputs)
+            X = self._preprocessor.transform(df)
+        predictions = self._model.predict(X)
+
+        return [
+            float(f"{max(0.0, min(10.0, float(p))):.2f}") for p in predictions
+        ]
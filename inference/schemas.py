@@ -10,6 +10,11 @@ import yaml
 from typing import Any
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml C binding
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
 
 # --- Load Schema from params.yaml ---
 # This ensures API validation is always in sync with the data pipeline config.
@@ -22,7 +27,7 @@ _schema: dict[str, Any] = {}
 if os.path.exists(PARAMS_PATH):
     try:
         with open(PARAMS_PATH, "r") as f:
-            _params = yaml.safe_load(f) or {}
+            _params = yaml.load(f, Loader=_YamlLoader) or {}
             _schema = _params.get("schema", {})
     except (yaml.YAMLError, IOError):
         pass
@@ -50,6 +55,22 @@ VALID_DOSAGES      = [float(v) for v in _schema.get("dosage_values", [])] if _sc
 AGE_RANGE      = _schema.get("age_range", [0, 100]) if _schema else [0, 100]
 DURATION_RANGE = _schema.get("duration_range", [1, 365]) if _schema else [1, 365]
 
+# O(1) membership sets for the hot validation path (the lists above are kept
+# for dropdowns and error messages). Dosages are rounded to avoid float
+# equality pitfalls on set lookup.
+_GENDER_SET      = frozenset(VALID_GENDERS)
+_CONDITION_SET   = frozenset(VALID_CONDITIONS)
+_DRUG_SET        = frozenset(VALID_DRUGS)
+_SIDE_EFFECT_SET = frozenset(VALID_SIDE_EFFECTS)
+_DOSAGE_SET      = frozenset(round(v, 3) for v in VALID_DOSAGES)
+
+# Error-message suffixes built once at import, not per failed request
+_GENDER_ERR      = f"Must be one of: {VALID_GENDERS}"
+_CONDITION_ERR   = f"Must be one of: {VALID_CONDITIONS}"
+_DRUG_ERR        = f"Must be one of: {VALID_DRUGS}"
+_SIDE_EFFECT_ERR = f"Must be one of: {VALID_SIDE_EFFECTS}"
+_DOSAGE_ERR      = f"Must be one of: {VALID_DOSAGES}"
+
 
 class PredictionRequest(BaseModel):
     """Schema for prediction API request. Matches CSV schema exactly."""
@@ -95,46 +116,36 @@ class PredictionRequest(BaseModel):
     @field_validator("Gender")
     @classmethod
     def validate_gender(cls, v):
-        if v not in VALID_GENDERS:
-            raise ValueError(
-                f"Invalid Gender: '{v}'. Must be one of: {VALID_GENDERS}"
-            )
+        if v not in _GENDER_SET:
+            raise ValueError(f"Invalid Gender: '{v}'. {_GENDER_ERR}")
         return v
 
     @field_validator("Condition")
     @classmethod
     def validate_condition(cls, v):
-        if v not in VALID_CONDITIONS:
-            raise ValueError(
-                f"Invalid Condition: '{v}'. Must be one of: {VALID_CONDITIONS}"
-            )
+        if v not in _CONDITION_SET:
+            raise ValueError(f"Invalid Condition: '{v}'. {_CONDITION_ERR}")
         return v
 
     @field_validator("Drug_Name")
     @classmethod
     def validate_drug(cls, v):
-        if v not in VALID_DRUGS:
-            raise ValueError(
-                f"Invalid Drug_Name: '{v}'. Must be one of: {VALID_DRUGS}"
-            )
+        if v not in _DRUG_SET:
+            raise ValueError(f"Invalid Drug_Name: '{v}'. {_DRUG_ERR}")
         return v
 
     @field_validator("Side_Effects")
     @classmethod
     def validate_side_effects(cls, v):
-        if v not in VALID_SIDE_EFFECTS:
-            raise ValueError(
-                f"Invalid Side_Effects: '{v}'. Must be one of: {VALID_SIDE_EFFECTS}"
-            )
+        if v not in _SIDE_EFFECT_SET:
+            raise ValueError(f"Invalid Side_Effects: '{v}'. {_SIDE_EFFECT_ERR}")
         return v
 
     @field_validator("Dosage_mg")
     @classmethod
     def validate_dosage(cls, v):
-        if v not in VALID_DOSAGES:
-            raise ValueError(
-                f"Invalid Dosage_mg: {v}. Must be one of: {VALID_DOSAGES}"
-            )
+        if round(v, 3) not in _DOSAGE_SET:
+            raise ValueError(f"Invalid Dosage_mg: {v}. {_DOSAGE_ERR}")
         return v
 
     @model_validator(mode="after")
@@ -161,6 +172,13 @@ class PredictionRequest(BaseModel):
         return self
 
 
+DISCLAIMER = (
+    "This system predicts patient treatment outcome scores to support "
+    "clinical research, quality analysis, and exploratory analytics. "
+    "It does not provide diagnostic or treatment recommendations."
+)
+
+
 class PredictionResponse(BaseModel):
     """Schema for prediction API response."""
 
@@ -181,11 +199,7 @@ class PredictionResponse(BaseModel):
         description="Model version identifier"
     )
     disclaimer: str = Field(
-        default=(
-            "This system predicts patient treatment outcome scores to support "
-            "clinical research, quality analysis, and exploratory analytics. "
-            "It does not provide diagnostic or treatment recommendations."
-        ),
+        default=DISCLAIMER,
         description="Non-clinical disclaimer",
     )
 
@@ -209,3 +223,9 @@ class DropdownValues(BaseModel):
     side_effects: list[str] = Field(default_factory=lambda: VALID_SIDE_EFFECTS)
     dosages: list[float]    = Field(default_factory=lambda: VALID_DOSAGES)
     valid_combinations: list[dict] = Field(default_factory=lambda: VALID_COMBINATIONS)
+
+
+# Single shared instance: the dropdown values never change at runtime, so
+# consumers reuse this object instead of re-running the default factories
+# on every construction.
+STATIC_DROPDOWNS = DropdownValues()
@@ -0,0 +1,22 @@
+"""
+Shared params.yaml Loader
+--------------------------
+Parses params.yaml with libyaml's C loader when PyYAML was built with it
+(5-10x faster than the pure-Python parser) and caches the result, so
+stages chained inside one process don't re-read and re-parse the file.
+"""
+
+import functools
+import yaml
+
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml C binding
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+
+@functools.lru_cache(maxsize=None)
+def load_params(path: str = "params.yaml") -> dict:
+    """Load and cache pipeline parameters from a YAML file."""
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=_YamlLoader)
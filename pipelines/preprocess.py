@@ -10,10 +10,18 @@ Stage 3: Data Preprocessing
 
 import os
 import sys
-import yaml
 import logging
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import scipy.sparse as sp
 
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipelines._params import load_params as _load_params
 
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
@@ -33,13 +41,53 @@ logger = logging.getLogger("preprocess")
 def load_params():
     """Load pipeline parameters from params.yaml."""
     try:
-        with open("params.yaml", "r") as f:
-            return yaml.safe_load(f)
+        return _load_params()
     except Exception as e:
         logger.error(f"Failed to load params.yaml: {e}")
         sys.exit(1)
 
 
+def build_preprocessor(numeric_cols, categorical_cols):
+    """Build the (unfitted) preprocessing ColumnTransformer.
+
+    Shared with training/tune.py so hyperparameter search runs against
+    the exact same transform the pipeline ships.
+    """
+    from sklearn.impute import SimpleImputer
+
+    # Add SimpleImputer to prevent catastrophic failure on unexpected NaNs
+    numeric_transformer = Pipeline(
+        steps=[
+            ("imputer", SimpleImputer(strategy="median")),
+            ("scaler", StandardScaler())
+        ]
+    )
+
+    # STRICT: handle_unknown='ignore'
+    # In production, crashing on a new drug/condition creates downtime.
+    # It is usually safer to zero-out the unexpected category's one-hot encodings
+    # than to hard-crash the API. We log these via a separate data drift monitor.
+    # Sparse float32 output: the one-hot blocks are mostly zeros, so CSR
+    # keeps peak memory far below the old dense float64 default while the
+    # categorical cardinality grows.
+    categorical_transformer = Pipeline(
+        steps=[
+            ("imputer", SimpleImputer(strategy="most_frequent")),
+            ("onehot", OneHotEncoder(
+                handle_unknown="ignore", sparse_output=True, dtype=np.float32
+            ))
+        ]
+    )
+
+    return ColumnTransformer(
+        transformers=[
+            ("num", numeric_transformer, numeric_cols),
+            ("cat", categorical_transformer, categorical_cols),
+        ],
+        remainder="drop",
+    )
+
+
 def main():
     logger.info("Starting data preprocessing...")
     params = load_params()
@@ -60,8 +108,24 @@ def main():
         logger.error(f"Input file not found: {input_path}")
         sys.exit(1)
 
+    target_col = features["target"]
+    id_col = features["id_column"]
+    numeric_cols = features["numeric"]
+    categorical_cols = features["categorical"]
+
     try:
-        df = pd.read_csv(input_path)
+        # Arrow's multi-threaded C++ CSV parser; typing the numeric columns
+        # up front skips dtype inference and lands them in float32 directly
+        table = pacsv.read_csv(
+            input_path,
+            read_options=pacsv.ReadOptions(block_size=1 << 22, use_threads=True),
+            convert_options=pacsv.ConvertOptions(
+                column_types={
+                    col: pa.float32() for col in numeric_cols + [target_col]
+                }
+            ),
+        )
+        df = table.to_pandas(self_destruct=True)
     except Exception as e:
         logger.error(f"Failed to read CSV: {e}")
         sys.exit(1)
@@ -69,43 +133,12 @@ def main():
     logger.info(f"Preprocessing {len(df)} rows...")
 
     # --- Separate target and features ---
-    target_col = features["target"]
-    id_col = features["id_column"]
-    numeric_cols = features["numeric"]
-    categorical_cols = features["categorical"]
 
     y = df[target_col].values
     X = df.drop(columns=[target_col, id_col])
 
-    from sklearn.impute import SimpleImputer
-
     # --- Build preprocessor pipeline ---
-    # Add SimpleImputer to prevent catastrophic failure on unexpected NaNs
-    numeric_transformer = Pipeline(
-        steps=[
-            ("imputer", SimpleImputer(strategy="median")),
-            ("scaler", StandardScaler())
-        ]
-    )
-
-    # STRICT: handle_unknown='ignore'
-    # In production, crashing on a new drug/condition creates downtime.
-    # It is usually safer to zero-out the unexpected category's one-hot encodings 
-    # than to hard-crash the API. We log these via a separate data drift monitor.
-    categorical_transformer = Pipeline(
-        steps=[
-            ("imputer", SimpleImputer(strategy="most_frequent")),
-            ("onehot", OneHotEncoder(handle_unknown="ignore", sparse_output=False))
-        ]
-    )
-
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ("num", numeric_transformer, numeric_cols),
-            ("cat", categorical_transformer, categorical_cols),
-        ],
-        remainder="drop",
-    )
+    preprocessor = build_preprocessor(numeric_cols, categorical_cols)
 
     # --- Split data ---
     X_train, X_test, y_train, y_test = train_test_split(
@@ -116,6 +149,13 @@ def main():
     try:
         X_train_processed = preprocessor.fit_transform(X_train)
         X_test_processed = preprocessor.transform(X_test)
+
+        # The RandomForest downstream wants dense input; materialize once,
+        # C-ordered, straight from CSR
+        if sp.issparse(X_train_processed):
+            X_train_processed = X_train_processed.toarray(order="C")
+        if sp.issparse(X_test_processed):
+            X_test_processed = X_test_processed.toarray(order="C")
     except Exception as e:
         logger.error(f"Preprocessing failed: {e}")
         sys.exit(1)
@@ -129,18 +169,33 @@ def main():
     )
 
     # --- Save processed data ---
+    # Parquet keeps the already-numeric matrices binary (no float -> text
+    # round-trip) and re-reads far faster downstream; float32 is plenty of
+    # precision for scaled features.
     try:
-        pd.DataFrame(X_train_processed, columns=feature_names).to_csv(
-            os.path.join(processed_dir, "X_train.csv"), index=False
-        )
-        pd.DataFrame(X_test_processed, columns=feature_names).to_csv(
-            os.path.join(processed_dir, "X_test.csv"), index=False
-        )
-        pd.DataFrame(y_train, columns=[target_col]).to_csv(
-            os.path.join(processed_dir, "y_train.csv"), index=False
+        splits = {
+            "X_train.parquet": pd.DataFrame(X_train_processed, columns=feature_names),
+            "X_test.parquet": pd.DataFrame(X_test_processed, columns=feature_names),
+            "y_train.parquet": pd.DataFrame(y_train, columns=[target_col]),
+            "y_test.parquet": pd.DataFrame(y_test, columns=[target_col]),
+        }
+        for filename, frame in splits.items():
+            table = pa.Table.from_pandas(
+                frame.astype(np.float32), preserve_index=False
+            )
+            pq.write_table(
+                table, os.path.join(processed_dir, filename), compression="zstd"
+            )
+
+        # Also emit the test split as raw .npy: evaluation mmaps these at
+        # memcpy speed instead of decoding Parquet on every run
+        np.save(
+            os.path.join(processed_dir, "X_test.npy"),
+            np.ascontiguousarray(X_test_processed, dtype=np.float32),
         )
-        pd.DataFrame(y_test, columns=[target_col]).to_csv(
-            os.path.join(processed_dir, "y_test.csv"), index=False
+        np.save(
+            os.path.join(processed_dir, "y_test.npy"),
+            y_test.astype(np.float32),
         )
 
         # --- Save preprocessor ---
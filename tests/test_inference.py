@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
+import asyncio
 import sys
 import os
 
@@ -71,3 +72,56 @@ def test_predict_endpoint_invalid_schema():
 def test_dropdown_values_endpoint():
     response = client.get("/dropdown-values")
     assert response.status_code == 200
+
+def test_microbatcher_coalesces_concurrent_submits_in_order():
+    from inference.batching import MicroBatcher
+
+    class StubLoader:
+        def __init__(self):
+            self.batch_sizes = []
+
+        def predict(self, input_data):
+            self.batch_sizes.append(1)
+            return float(input_data["value"])
+
+        def predict_batch(self, inputs):
+            self.batch_sizes.append(len(inputs))
+            return [float(item["value"]) for item in inputs]
+
+    async def scenario():
+        loader = StubLoader()
+        batcher = MicroBatcher(loader, max_batch=8, max_wait_ms=50.0)
+        results = await asyncio.gather(
+            *(batcher.submit({"value": i}) for i in range(5))
+        )
+        await batcher.stop()
+        return loader, results
+
+    loader, results = asyncio.run(scenario())
+    # One batched call, results matched back to submitters in order
+    assert loader.batch_sizes == [5]
+    assert results == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+def test_microbatcher_propagates_predict_error_to_all_waiters():
+    from inference.batching import MicroBatcher
+
+    class FailingLoader:
+        def predict(self, input_data):
+            raise RuntimeError("model exploded")
+
+        def predict_batch(self, inputs):
+            raise RuntimeError("model exploded")
+
+    async def scenario():
+        batcher = MicroBatcher(FailingLoader(), max_batch=8, max_wait_ms=50.0)
+        results = await asyncio.gather(
+            *(batcher.submit({"value": i}) for i in range(3)),
+            return_exceptions=True,
+        )
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(scenario())
+    # Every waiter gets the error instead of hanging on its future
+    assert len(results) == 3
+    assert all(isinstance(r, RuntimeError) for r in results)
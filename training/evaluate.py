@@ -8,13 +8,17 @@ Computes RMSE, MAE, R² and writes to metrics/scores.json.
 import os
 import sys
 import json
-import yaml
+import math
 import logging
-import pandas as pd
 import numpy as np
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+import pyarrow.parquet as pq
 import joblib
 
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipelines._params import load_params as _load_params
+
 # --- Logging Configuration ---
 logging.basicConfig(
     level=logging.INFO,
@@ -25,10 +29,9 @@ logger = logging.getLogger("evaluate")
 
 
 def load_params():
-    """Load pipeline parameters from params.yaml."""
+    """Load pipeline parameters from params.yaml (cached across stages)."""
     try:
-        with open("params.yaml", "r") as f:
-            return yaml.safe_load(f)
+        return _load_params()
     except Exception as e:
         logger.error(f"Failed to load params.yaml: {e}")
         sys.exit(1)
@@ -47,34 +50,86 @@ def main():
         sys.exit(1)
 
     # --- Load test data ---
-    X_test_path = os.path.join(processed_dir, "X_test.csv")
-    y_test_path = os.path.join(processed_dir, "y_test.csv")
+    X_test_npy = os.path.join(processed_dir, "X_test.npy")
+    y_test_npy = os.path.join(processed_dir, "y_test.npy")
+    X_test_path = os.path.join(processed_dir, "X_test.parquet")
+    y_test_path = os.path.join(processed_dir, "y_test.parquet")
     model_path = os.path.join(model_dir, "model.joblib")
 
-    for path in [X_test_path, y_test_path, model_path]:
+    use_npy = os.path.exists(X_test_npy) and os.path.exists(y_test_npy)
+    required = [model_path] if use_npy else [X_test_path, y_test_path, model_path]
+    for path in required:
         if not os.path.exists(path):
             logger.error(f"Required file not found: {path}")
             sys.exit(1)
 
     try:
-        X_test = pd.read_csv(X_test_path)
-        y_test = pd.read_csv(y_test_path).values.ravel()
-        model = joblib.load(model_path)
+        if use_npy:
+            # Preprocessing saved the test split as raw contiguous float32;
+            # np.load mmaps it straight off disk with no decode step
+            X_test = np.load(X_test_npy, mmap_mode="r")
+            y_test = np.load(y_test_npy)
+        else:
+            # Parquet fallback for artifacts from older pipeline runs.
+            # Contiguous float32 matches the trees' internal dtype, so
+            # predict skips the conversion copy in _validate_X_predict
+            X_test = np.ascontiguousarray(
+                pq.read_table(X_test_path)
+                .to_pandas(self_destruct=True)
+                .to_numpy(dtype=np.float32)
+            )
+            y_test = pq.read_table(y_test_path).column(0).to_numpy()
+        # mmap the tree arrays instead of materializing them on the heap;
+        # predict reads them sequentially straight from the page cache.
+        # joblib falls back to a full load if the dump was compressed.
+        model = joblib.load(model_path, mmap_mode="r")
     except Exception as e:
         logger.error(f"Failed to load data or model: {e}")
         sys.exit(1)
 
+    y_test = y_test.astype(np.float32, copy=False)
+
     # --- Predict ---
-    try:
-        y_pred = model.predict(X_test)
-    except Exception as e:
-        logger.error(f"Prediction failed: {e}")
-        sys.exit(1)
+    # Prefer the compiled treelite predictor when train.py exported one;
+    # it walks natively compiled trees instead of sklearn's per-tree
+    # Cython dispatch.
+    y_pred = None
+    lib_path = os.path.join(model_dir, "model.so")
+    if os.path.exists(lib_path):
+        try:
+            import treelite_runtime as rt
+
+            predictor = rt.Predictor(lib_path)
+            y_pred = predictor.predict(rt.DMatrix(X_test)).astype(np.float32)
+            logger.info("Predicted with compiled native model")
+        except Exception as e:
+            logger.warning(f"Native predictor unavailable, using sklearn: {e}")
+
+    if y_pred is None:
+        # Predict in fixed-size chunks with a single thread: small enough for
+        # the tree nodes to stay cache-resident across the per-tree passes,
+        # and joblib's n_jobs>1 dispatch overhead isn't worth it at these
+        # sizes.
+        model.n_jobs = 1
+        chunk_size = 4096
+        y_pred = np.empty(len(X_test), dtype=np.float32)
+        try:
+            for i in range(0, len(X_test), chunk_size):
+                y_pred[i:i + chunk_size] = model.predict(X_test[i:i + chunk_size])
+        except Exception as e:
+            logger.error(f"Prediction failed: {e}")
+            sys.exit(1)
 
     # --- Compute metrics ---
-    rmse = float(np.sqrt(mean_squared_error(y_test, y_pred)))
-    mae = float(mean_absolute_error(y_test, y_pred))
-    r2 = float(r2_score(y_test, y_pred))
+    # All three metrics derive from the residual vector, so compute it once
+    # and fuse the passes: the separate sklearn calls each re-walked
+    # y_test/y_pred and allocated their own temporaries.
+    r = (y_pred - y_test).astype(np.float32, copy=False)
+    mse = float(np.dot(r, r) / r.size)
+    rmse = math.sqrt(mse)
+    mae = float(np.abs(r).mean())
+    ss_tot = float(np.square(y_test - y_test.mean()).sum())
+    r2 = 1.0 - mse * r.size / ss_tot
 
     metrics = {
         "rmse": round(rmse, 4),
@@ -2,12 +2,25 @@ import os
 import sys
 import yaml
 import json
+import socket
 import subprocess
 import time
 import requests
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipelines._params import load_params
+
+# libyaml's C loader when the wheel ships it, pure-Python parser otherwise
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 # --- Configuration ---
 REQUIRED_FILES = [
     "README.md",
@@ -39,10 +52,10 @@ def log(msg, status="INFO"):
     else:
         print(f"[INFO] {msg}")
 
-def run_cmd(cmd, cwd=None, capture_output=True, timeout=600):
+def run_cmd(cmd, cwd=None, env=None, capture_output=True, timeout=600):
     try:
         result = subprocess.run(
-            cmd, check=True, cwd=cwd,
+            cmd, check=True, cwd=cwd, env=env,
             stdout=subprocess.PIPE if capture_output else None,
             stderr=subprocess.PIPE if capture_output else None,
             text=True,
@@ -54,17 +67,44 @@ def run_cmd(cmd, cwd=None, capture_output=True, timeout=600):
     except subprocess.CalledProcessError as e:
         return False, e.stderr
 
+def wait_for_port(host, port, timeout=15.0):
+    """Wait for a TCP port to accept connections, backing off from 50 ms
+    up to an 800 ms cap. Much faster than fixed 1 s HTTP polling when the
+    server comes up quickly."""
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            sock.settimeout(0.5)
+            if sock.connect_ex((host, port)) == 0:
+                return True
+        time.sleep(0.05 * 2 ** min(attempt, 4))
+        attempt += 1
+    return False
+
 def step_1_integrity():
     log("Step 1: Repository Integrity Check")
+    # One scandir per parent directory instead of one stat per file
+    groups = {}
     for f in REQUIRED_FILES:
-        if not Path(f).exists():
-            log(f"Missing mandatory file: {f}", "FAIL")
+        p = Path(f)
+        groups.setdefault(p.parent, set()).add(p.name)
+
+    for directory, names in groups.items():
+        try:
+            present = {entry.name for entry in os.scandir(directory)}
+        except FileNotFoundError:
+            present = set()
+        missing = names - present
+        if missing:
+            for name in sorted(missing):
+                log(f"Missing mandatory file: {directory / name}", "FAIL")
             return False
-    
+
     # Check YAML syntax
     try:
-        with open("dvc.yaml") as f: yaml.safe_load(f)
-        with open("params.yaml") as f: yaml.safe_load(f)
+        with open("dvc.yaml") as f: yaml.load(f, Loader=_YamlLoader)
+        with open("params.yaml") as f: yaml.load(f, Loader=_YamlLoader)
         log("YAML syntax and mandatory files verified", "PASS")
     except Exception as e:
         log(f"YAML syntax error: {e}", "FAIL")
@@ -73,11 +113,29 @@ def step_1_integrity():
 
 def step_2_dvc_pipeline():
     log("Step 2: DVC Pipeline Verification (Smoke Test)")
+    artifacts = ["models/model.joblib", "metrics/scores.json", "data/processed/preprocessor.joblib"]
+
+    # An empty `dvc status --json` means every stage hash is up to date;
+    # skip the repro (minutes of retraining) and just verify artifacts.
+    status_ok, status_out = run_cmd(["dvc", "status", "--json"])
+    if status_ok:
+        try:
+            changed = json.loads(status_out or "{}")
+        except json.JSONDecodeError:
+            changed = None
+        if changed == {}:
+            log("DVC pipeline up-to-date; skipping repro", "PASS")
+            for art in artifacts:
+                if not Path(art).exists():
+                    log(f"Artifact missing despite clean status: {art}", "FAIL")
+                    return False
+            log("Pipeline artifacts verified", "PASS")
+            return True
+
     # Ensure pipeline is up to date or can run
     success, output = run_cmd(["dvc", "repro"])
     if success:
         log("DVC pipeline executed/verified successfully", "PASS")
-        artifacts = ["models/model.joblib", "metrics/scores.json", "data/processed/preprocessor.joblib"]
         for art in artifacts:
             if not Path(art).exists():
                 log(f"Artifact missing after pipeline run: {art}", "FAIL")
@@ -106,21 +164,68 @@ def step_3_docker_builds():
         "frontend": "infra/docker/Dockerfile.frontend"
     }
     
-    for name, path in images.items():
-        log(f"Building {name} image...")
-        build_success, err = run_cmd(["docker", "build", "-t", f"mlops-{name}-test", "-f", path, "."])
-        if not build_success:
-            log(f"Failed to build {name} image: {err}", "FAIL")
-            return False
-        log(f"{name.capitalize()} image built successfully", "PASS")
-    return True
+    # The three builds share no ordering dependency, so run them
+    # concurrently (wall time becomes the slowest build instead of the
+    # sum); BuildKit additionally parallelizes stages within each build.
+    build_env = {**os.environ, "DOCKER_BUILDKIT": "1"}
+    all_built = True
+    with ThreadPoolExecutor(max_workers=len(images)) as pool:
+        log(f"Building {', '.join(images)} images in parallel...")
+        futures = {
+            pool.submit(
+                run_cmd,
+                ["docker", "build", "--progress=plain",
+                 "-t", f"mlops-{name}-test", "-f", path, "."],
+                env=build_env,
+            ): name
+            for name, path in images.items()
+        }
+        for fut in as_completed(futures):
+            name = futures[fut]
+            build_success, err = fut.result()
+            if build_success:
+                log(f"{name.capitalize()} image built successfully", "PASS")
+            else:
+                log(f"Failed to build {name} image: {err}", "FAIL")
+                all_built = False
+    return all_built
+
+def verify_nodeports():
+    # Check Port Consistency (Frontend: 30880, Inference: 30800)
+    try:
+        with open("infra/k8s/frontend-service.yaml") as f:
+            frontend_svc = yaml.safe_load(f)
+            if frontend_svc["spec"]["ports"][0]["nodePort"] != 30880:
+                 log("Frontend NodePort is not 30880", "WARN")
+
+        with open("infra/k8s/inference-service.yaml") as f:
+            inference_svc = yaml.safe_load(f)
+            if inference_svc["spec"]["ports"][0]["nodePort"] != 30800:
+                 log("Inference NodePort is not 30800", "WARN")
+
+        log("K8s NodePort configuration verified (Frontend: 30880, Inference: 30800)", "PASS")
+    except Exception as e:
+        log(f"Failed to verify K8s ports: {e}", "WARN")
 
 def step_4_k8s_validation():
     log("Step 4: Kubernetes Manifest Validation")
+
+    # Prefer kubeconform: validates every manifest concurrently in one
+    # process against bundled schemas — no cluster, no OpenAPI download,
+    # no connection-refused warn path
+    if shutil.which("kubeconform"):
+        success, output = run_cmd(["kubeconform", "-strict", "-summary", "infra/k8s/"])
+        if success:
+            log("K8s manifests passed kubeconform validation", "PASS")
+            verify_nodeports()
+            return True
+        log(f"kubeconform validation failed: {output}", "FAIL")
+        return False
+
     if not shutil.which("kubectl"):
         log("kubectl missing", "FAIL")
         return False
-    
+
     # Dry-run validation does not require a cluster strictly if we disable openapi validation
     cmd = ["kubectl", "apply", "--validate=false", "--dry-run=client", "-f", "infra/k8s/"]
     success, output = run_cmd(cmd)
@@ -137,23 +242,7 @@ def step_4_k8s_validation():
 
     if success:
         log("K8s manifests passed dry-run validation", "PASS")
-        
-        # Check Port Consistency (Frontend: 30880, Inference: 30800)
-        try:
-            with open("infra/k8s/frontend-service.yaml") as f:
-                frontend_svc = yaml.safe_load(f)
-                if frontend_svc["spec"]["ports"][0]["nodePort"] != 30880:
-                     log("Frontend NodePort is not 30880", "WARN")
-            
-            with open("infra/k8s/inference-service.yaml") as f:
-                inference_svc = yaml.safe_load(f)
-                if inference_svc["spec"]["ports"][0]["nodePort"] != 30800:
-                     log("Inference NodePort is not 30800", "WARN")
-            
-            log("K8s NodePort configuration verified (Frontend: 30880, Inference: 30800)", "PASS")
-        except Exception as e:
-            log(f"Failed to verify K8s ports: {e}", "WARN")
-
+        verify_nodeports()
         return True
     else:
         log(f"K8s manifest validation failed: {output}", "FAIL")
@@ -172,20 +261,25 @@ def step_5_api_runtime():
     except Exception as e:
         log(f"Failed to start uvicorn subprocess: {e}", "FAIL")
         return False
-        
+
+    # One keep-alive session for all three checks: a single pooled
+    # connection instead of a fresh TCP handshake per request
+    session = requests.Session()
+    session.mount(
+        "http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+    )
+
     try:
-        max_retries = 15
-        started = False
-        for i in range(max_retries):
+        # Probe the TCP port first; the HTTP GET only fires once the
+        # socket accepts, so a fast startup costs ~50 ms instead of 1 s.
+        started = wait_for_port("127.0.0.1", 8000, timeout=15.0)
+        if started:
             try:
-                resp = requests.get("http://127.0.0.1:8000/health")
-                if resp.status_code == 200:
-                    started = True
-                    break
-            except requests.ConnectionError:
-                pass
-            time.sleep(1)
-            
+                resp = session.get("http://127.0.0.1:8000/health", timeout=2)
+                started = resp.status_code == 200
+            except requests.RequestException:
+                started = False
+
         if not started:
             log("API failed to start or /health check failed", "FAIL")
             return False
@@ -202,9 +296,9 @@ def step_5_api_runtime():
             
         combo = valid_combos[0]
         
-        with open("params.yaml", "r") as f:
-            params = yaml.safe_load(f)
-            gender = params["schema"]["gender_values"][0]
+        # Memoized shared loader; parses params.yaml at most once per process
+        params = load_params()
+        gender = params["schema"]["gender_values"][0]
 
         payload = {
             "Patient_ID": "P9999",
@@ -216,15 +310,15 @@ def step_5_api_runtime():
             "Treatment_Duration_days": 30,
             "Side_Effects": combo["Side_Effects"]
         }
-        resp = requests.post("http://127.0.0.1:8000/predict", json=payload)
+        resp = session.post("http://127.0.0.1:8000/predict", json=payload)
         if resp.status_code == 200 and "Improvement_Score" in resp.json():
             log("API /predict verified with dynamic schema values", "PASS")
         else:
             log(f"API /predict failed: {resp.text}", "FAIL")
             return False
-            
+
         # Metrics check
-        resp = requests.get("http://127.0.0.1:8000/metrics")
+        resp = session.get("http://127.0.0.1:8000/metrics")
         if resp.status_code == 200 and "api_prediction_total" in resp.text:
             log("API /metrics verified", "PASS")
         else:
@@ -237,6 +331,7 @@ def step_5_api_runtime():
         log(f"Runtime verification error: {e}", "FAIL")
         return False
     finally:
+        session.close()
         if proc:
             proc.terminate()
             proc.wait()
@@ -1,6 +1,8 @@
 import os
 import sys
 import yaml
+import json
+import socket
 import subprocess
 import time
 import requests
@@ -8,6 +10,12 @@ import shutil
 import pandas as pd
 from pathlib import Path
 
+# libyaml's C loader when the wheel ships it, pure-Python parser otherwise
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 # --- Configuration ---
 REQUIRED_FILES = [
     "README.md",
@@ -59,23 +67,48 @@ def run_cmd(cmd, cwd=None, env=None, capture_output=True):
     except subprocess.CalledProcessError as e:
         return False, e.stderr
 
+def wait_for_port(host, port, timeout=10.0):
+    """Poll a TCP port with exponential backoff (50 ms doubling, 800 ms
+    cap) until it accepts a connection or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            sock.settimeout(0.5)
+            if sock.connect_ex((host, port)) == 0:
+                return True
+        time.sleep(0.05 * 2 ** min(attempt, 4))
+        attempt += 1
+    return False
+
 def step_1_integrity():
     log("Step 1: Repository Integrity Check")
     all_exist = True
+    # Batch the existence checks: one scandir per parent directory
+    # instead of one stat syscall per required file
+    groups = {}
     for f in REQUIRED_FILES:
-        if not Path(f).exists():
-            log(f"Missing file: {f}", "FAIL")
+        p = Path(f)
+        groups.setdefault(p.parent, set()).add(p.name)
+
+    for directory, names in groups.items():
+        try:
+            present = {entry.name for entry in os.scandir(directory)}
+        except FileNotFoundError:
+            present = set()
+        for name in sorted(names - present):
+            log(f"Missing file: {directory / name}", "FAIL")
             all_exist = False
-    
+
     if all_exist:
         log("All required files present", "PASS")
     else:
         return False
-        
+
     # Check YAML syntax
     try:
-        with open("dvc.yaml") as f: yaml.safe_load(f)
-        with open("params.yaml") as f: yaml.safe_load(f)
+        with open("dvc.yaml") as f: yaml.load(f, Loader=_YamlLoader)
+        with open("params.yaml") as f: yaml.load(f, Loader=_YamlLoader)
         log("YAML syntax valid", "PASS")
     except Exception as e:
         log(f"YAML syntax error: {e}", "FAIL")
@@ -86,8 +119,9 @@ def step_2_schema_check():
     log("Step 2: Dataset Schema Verification")
     csv_path = "data/raw/real_drug_dataset.csv"
     try:
-        df = pd.read_csv(csv_path)
-        cols = df.columns.tolist()
+        # nrows=0 parses only the header line; the full dataset never
+        # needs to be read just to compare column names
+        cols = pd.read_csv(csv_path, nrows=0).columns.tolist()
         if cols == EXPECTED_COLUMNS:
             log("CSV columns match expected schema", "PASS")
             return True
@@ -100,6 +134,24 @@ def step_2_schema_check():
 
 def step_3_dvc_pipeline():
     log("Step 3: DVC Pipeline Verification")
+
+    # When `dvc status --json` reports no changed stages (empty dict),
+    # skip the repro — it would retrain the model for nothing.
+    status_ok, status_out = run_cmd(["dvc", "status", "--json"])
+    if status_ok:
+        try:
+            changed = json.loads(status_out or "{}")
+        except json.JSONDecodeError:
+            changed = None
+        if changed == {}:
+            log("DVC pipeline up-to-date; skipping repro", "PASS")
+            if Path("models/model.joblib").exists() and Path("metrics/scores.json").exists():
+                log("Artifacts present (model + metrics)", "PASS")
+                return True
+            else:
+                log("Clean DVC status but artifacts missing", "FAIL")
+                return False
+
     success, output = run_cmd(["dvc", "repro"])
     if success:
         log("DVC pipeline ran successfully", "PASS")
@@ -130,6 +182,17 @@ def step_4_docker_check():
 
 def step_5_k8s_check():
     log("Step 5: Kubernetes Manifest Verification")
+
+    # kubeconform checks all manifests in one clusterless process;
+    # fall back to kubectl's client dry-run when it isn't installed
+    if check_cmd("kubeconform"):
+        success, output = run_cmd(["kubeconform", "-strict", "-summary", "infra/k8s/"])
+        if success:
+            log("K8s manifests syntax valid (kubeconform)", "PASS")
+            return True
+        log(f"K8s manifest validation failed: {output}", "FAIL")
+        return False
+
     if not check_cmd("kubectl"):
         log("kubectl not installed. Skipping manifest validation (PREREQUISITE MISSING)", "WARN")
         return True
@@ -160,23 +223,26 @@ def step_6_api_runtime():
         stdout=subprocess.DEVNULL,
         stderr=subprocess.DEVNULL
     )
-    
+
+    # Single keep-alive session reused for /health, /predict and /metrics
+    session = requests.Session()
+    session.mount(
+        "http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+    )
+
     try:
-        # Retry loop for health check
-        max_retries = 10
-        started = False
-        for i in range(max_retries):
+        # Wait on the TCP port with short backoff instead of 1 s polling,
+        # then hit /health once the socket accepts
+        started = wait_for_port("127.0.0.1", 8000, timeout=10.0)
+        if started:
             try:
-                resp = requests.get("http://127.0.0.1:8000/health")
-                if resp.status_code == 200:
-                    started = True
-                    break
-            except requests.ConnectionError:
-                pass
-            time.sleep(1)
-            
+                resp = session.get("http://127.0.0.1:8000/health", timeout=2)
+                started = resp.status_code == 200
+            except requests.RequestException:
+                started = False
+
         if not started:
-            log(f"API failed to start after {max_retries} seconds", "FAIL")
+            log("API failed to start within 10 seconds", "FAIL")
             return False
             
         log("API /health validation", "PASS")
@@ -192,7 +258,7 @@ def step_6_api_runtime():
             "Treatment_Duration_days": 10,
             "Side_Effects": "Nausea"
         }
-        resp = requests.post("http://127.0.0.1:8000/predict", json=payload)
+        resp = session.post("http://127.0.0.1:8000/predict", json=payload)
         if resp.status_code == 200:
             data = resp.json()
             if "Improvement_Score" in data:
@@ -205,7 +271,7 @@ def step_6_api_runtime():
             return False
             
         # Metrics test
-        resp = requests.get("http://127.0.0.1:8000/metrics")
+        resp = session.get("http://127.0.0.1:8000/metrics")
         if resp.status_code == 200 and "api_request_total" in resp.text:
             log("API /metrics validation", "PASS")
         else:
@@ -218,6 +284,7 @@ def step_6_api_runtime():
         log(f"API connection failed: {e}", "FAIL")
         return False
     finally:
+        session.close()
         proc.terminate()
         proc.wait()
 